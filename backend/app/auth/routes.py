@@ -61,6 +61,8 @@ def login_required(f):
             else:
                 return redirect(url_for('auth.login', next=request.url))
         return f(*args, **kwargs)
+    # Marker for tests; functools.wraps carries it through any outer decorators
+    decorated_function._login_required = True
     return decorated_function
 
 @auth_bp.route('/login', methods=['GET'])
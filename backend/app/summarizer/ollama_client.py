@@ -81,7 +81,8 @@ class OllamaClient:
             logger.error(f"Ollama API call failed: {str(e)}")
             return None
             
-    def generate(self, prompt, system_prompt=None, max_tokens=None, temperature=0.7):
+    def generate(self, prompt, system_prompt=None, max_tokens=None, temperature=0.7,
+                 options=None, keep_alive=None):
         """
         Generate text using Ollama with Deepseek R1 optimizations
         
@@ -90,6 +91,8 @@ class OllamaClient:
             system_prompt: Optional system prompt to guide the model's behavior
             max_tokens: Maximum tokens to generate (uses config default if None)
             temperature: Controls randomness in generation (0.0-1.0)
+            options: Optional Ollama generation options overriding the defaults
+            keep_alive: Optional duration (e.g. '10m') to keep the model loaded after the call
             
         Returns:
             Generated text or None if generation failed
@@ -113,13 +116,18 @@ class OllamaClient:
             }
         }
         
+        if options:
+            data["options"].update(options)
+        if keep_alive is not None:
+            data["keep_alive"] = keep_alive
+        
         # Add system prompt if provided
         if system_prompt:
             data["system"] = system_prompt
             
         token_estimate = len(prompt.split()) * 1.3  # Rough token estimate
         logger.debug(f"Generating with Ollama, approximate input tokens: {int(token_estimate)}")
-        logger.debug(f"Max output tokens: {max_tokens}")
+        logger.debug(f"Max output tokens: {data['options']['num_predict']}")
         
         # Make the API call
         result = self._call_ollama_api("generate", data)
@@ -135,7 +143,7 @@ class OllamaClient:
             
         return None
         
-    def summarize(self, text, max_length=150, min_length=50):
+    def summarize(self, text, max_length=150, min_length=50, options=None, keep_alive=None):
         """
         Summarize text using Ollama with Deepseek R1 optimizations
         
@@ -143,6 +151,8 @@ class OllamaClient:
             text: The text to summarize
             max_length: Maximum word count for the summary
             min_length: Minimum word count for the summary
+            options: Optional Ollama generation options overriding the defaults
+            keep_alive: Optional duration (e.g. '10m') to keep the model loaded after the call
             
         Returns:
             Summarized text or None if summarization failed
@@ -175,7 +185,9 @@ SUMMARY:"""
             prompt=prompt, 
             system_prompt=system_prompt,
             max_tokens=min(estimated_max_tokens, self.max_tokens),  # Don't exceed config max
-            temperature=0.3  # Lower temperature for more focused summaries
+            temperature=0.3,  # Lower temperature for more focused summaries
+            options=options,
+            keep_alive=keep_alive
         )
         
         if not summary:
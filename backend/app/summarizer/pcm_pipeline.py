@@ -0,0 +1,33 @@
+"""
+Validate and transcribe audio that is already decoded into memory.
+"""
+import logging
+from app.summarizer.processor import validate_pcm, transcribe_pcm
+from app.utils.errors import AudioProcessingError
+
+logger = logging.getLogger(__name__)
+
+def process_pcm(samples, sample_rate):
+    """
+    Validate and transcribe mono float32 PCM in one pass over the buffer
+
+    Args:
+        samples (numpy.ndarray): Mono float32 PCM samples
+        sample_rate (int): Sample rate in Hz
+
+    Returns:
+        dict: duration (seconds) and transcription
+
+    Raises:
+        AudioProcessingError: If the samples are empty or silent
+    """
+    if not validate_pcm(samples, sample_rate):
+        raise AudioProcessingError("Invalid audio extracted from video")
+
+    duration = len(samples) / sample_rate
+    logger.info("Audio validation passed (%.2f seconds)", duration)
+
+    return {
+        "duration": duration,
+        "transcription": transcribe_pcm(samples, sample_rate)
+    }
@@ -38,14 +38,13 @@ def main():
     # Import after setting environment variables
     from app.main import create_app
     
-    # Directly set the global variables in processor.py
+    # Set the test mode flags in processor.py
     try:
         from app.summarizer.processor import logger as processor_logger
         import app.summarizer.processor as processor_module
         
         # Disable test mode
-        processor_module.IN_TEST_MODE = False
-        processor_module.TEST_TRANSCRIBE_ERROR = False
+        processor_module.set_test_mode(in_test=False, transcribe_error=False)
         
         logger.info("Test mode disabled for processor")
         processor_logger.info("Processor running in normal mode")
@@ -38,15 +38,17 @@ def main():
     # Import after setting environment variables
     from app.main import create_app
     
-    # Directly set the global variables in processor.py
+    # Set the test mode flags in processor.py
     try:
         from app.summarizer.processor import logger as processor_logger
         import app.summarizer.processor as processor_module
         
         # Enable test mode
-        processor_module.IN_TEST_MODE = True
-        processor_module.TEST_TRANSCRIBE_OUTPUT = "This is a test transcription generated in test mode. The transcription service has been bypassed."
-        processor_module.TEST_TRANSCRIBE_ERROR = False
+        processor_module.set_test_mode(
+            in_test=True,
+            transcribe_output="This is a test transcription generated in test mode. The transcription service has been bypassed.",
+            transcribe_error=False
+        )
         
         logger.info("Test mode enabled for processor")
         processor_logger.info("Processor test mode enabled")
@@ -3,13 +3,16 @@ import os
 import sys
 import json
 import argparse
+import asyncio
 import subprocess
 import logging
 import time
 import signal
 import tempfile
-from app.summarizer.processor import VideoSummarizer
-from flask import Flask
+import importlib
+import re
+import threading
+from collections import deque
 
 # Set up logging
 logging.basicConfig(
@@ -26,6 +29,59 @@ logger = logging.getLogger("video_simple")
 # Global variables for process control
 TIMEOUT = 60  # Default timeout in seconds for each operation
 
+# Short, deterministic generation for the Ollama probe; keep the model resident between calls
+OLLAMA_TEST_OPTIONS = {'num_predict': 128, 'num_ctx': 2048, 'temperature': 0.0, 'top_p': 1.0}
+OLLAMA_KEEP_ALIVE = '10m'
+
+# Sentence boundaries for the no-NLTK fallback splitter
+_SENT_SPLIT = re.compile(r'[.!?]+\s*')
+
+# Heavy ML modules are loaded on first use so the Ollama path never pays for them
+_torch = None
+_pipeline = None
+_sent_tokenize = None
+_bart_pipeline = None
+
+def _lazy_torch():
+    """Import torch once, on first use"""
+    global _torch
+    if _torch is None:
+        _torch = importlib.import_module('torch')
+    return _torch
+
+def _lazy_pipeline():
+    """Import transformers.pipeline once, on first use"""
+    global _pipeline
+    if _pipeline is None:
+        _pipeline = importlib.import_module('transformers').pipeline
+    return _pipeline
+
+def _lazy_sent_tokenize():
+    """Import NLTK's sentence tokenizer once, downloading punkt on first use"""
+    global _sent_tokenize
+    if _sent_tokenize is None:
+        nltk = importlib.import_module('nltk')
+        nltk.download('punkt', quiet=True)
+        _sent_tokenize = importlib.import_module('nltk.tokenize').sent_tokenize
+    return _sent_tokenize
+
+def _get_bart_pipeline():
+    """Build the BART summarization pipeline once and warm it up with a dummy pass"""
+    global _bart_pipeline
+    if _bart_pipeline is None:
+        torch = _lazy_torch()
+        pipeline = _lazy_pipeline()
+        
+        # Use a smaller, faster model for testing
+        device = 0 if torch.cuda.is_available() else -1
+        print("Loading BART model...")
+        summarizer = pipeline("summarization", model="facebook/bart-base", device=device)
+        
+        # First inference pays for lazy CUDA/kernel setup; do it before any real call
+        summarizer("warm up text " * 30, max_length=20, min_length=5, do_sample=False)
+        _bart_pipeline = summarizer
+    return _bart_pipeline
+
 def timeout_handler(signum, frame):
     """Handle timeout by raising an exception"""
     print("\n\n*** TIMEOUT OCCURRED - OPERATION TOOK TOO LONG ***\n")
@@ -49,6 +105,27 @@ def run_with_timeout(func, timeout, *args, **kwargs):
     finally:
         signal.alarm(0)  # Ensure the alarm is canceled
 
+def _run_ffmpeg(cmd, timeout, tail_lines=200):
+    """Run ffmpeg keeping only the last stderr lines; returns (returncode, stderr_tail)"""
+    process = subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    tail = deque(maxlen=tail_lines)
+    
+    # Drain stderr in the background so a chatty ffmpeg never blocks on a full pipe
+    drain = threading.Thread(
+        target=lambda: tail.extend(line.decode(errors='replace') for line in process.stderr),
+        daemon=True
+    )
+    drain.start()
+    try:
+        returncode = process.wait(timeout=timeout)
+    finally:
+        if process.poll() is None:
+            process.terminate()
+            process.wait()
+        drain.join()
+        process.stderr.close()
+    return returncode, ''.join(tail)
+
 def extract_short_segment(video_path, duration=5):
     """Extract a very short segment from the video"""
     print(f"Extracting {duration} second segment from video...")
@@ -69,10 +146,10 @@ def extract_short_segment(video_path, duration=5):
     
     try:
         print(f"Running command: {' '.join(cmd)}")
-        result = subprocess.run(cmd, capture_output=True, text=True, timeout=30)
+        returncode, stderr_tail = _run_ffmpeg(cmd, timeout=30)
         
-        if result.returncode != 0:
-            print(f"Error extracting segment: {result.stderr}")
+        if returncode != 0:
+            print(f"Error extracting segment: {stderr_tail}")
             return None
         
         print(f"Successfully extracted segment to {output_path}")
@@ -95,19 +172,17 @@ def simple_summarize(text, max_sentences=3):
     try:
         # Try to use NLTK for better sentence splitting
         try:
-            from nltk.tokenize import sent_tokenize
-            import nltk
-            nltk.download('punkt', quiet=True)
-            sentences = sent_tokenize(text)
+            sentences = _lazy_sent_tokenize()(text)
+            separator = ' '
         except (ImportError, ModuleNotFoundError):
             # Fall back to simple splitting if NLTK not available
             print("NLTK not available, using simple sentence splitting")
-            sentences = text.replace('!', '.').replace('?', '.').split('.')
-            sentences = [s.strip() + '.' for s in sentences if s.strip()]
+            sentences = [s for s in (part.strip() for part in _SENT_SPLIT.split(text)) if s]
+            separator = '. '
         
         # Create summary from first few sentences
         if len(sentences) > max_sentences:
-            summary = ' '.join(sentences[:max_sentences])
+            summary = separator.join(sentences[:max_sentences])
             if not summary.endswith('.'):
                 summary += '.'
             return summary + f" [Truncated from {len(sentences)} sentences]"
@@ -133,7 +208,10 @@ def test_ollama_summarization():
         
         # Test summarization with a simple text
         test_text = "This is a test text for the Ollama summarization. " * 10
-        summary = ollama_client.summarize(test_text, min_length=30, max_length=100)
+        summary = ollama_client.summarize(
+            test_text, min_length=30, max_length=100,
+            options=OLLAMA_TEST_OPTIONS, keep_alive=OLLAMA_KEEP_ALIVE
+        )
         
         if summary:
             print(f"Ollama summarization successful: {summary}")
@@ -145,61 +223,58 @@ def test_ollama_summarization():
         print(f"Error testing Ollama: {str(e)}")
         return False
 
-def summarize_from_text(text):
-    """Directly test summarization from a given text"""
-    print(f"Summarizing text of length {len(text)} characters...")
-    
-    # 1. Try using Ollama
+def _try_ollama(text):
+    """Summarize with Ollama; returns None if unavailable or empty"""
     try:
         from app.summarizer.ollama_client import ollama_client
         
-        if ollama_client.health_check():
-            summary = ollama_client.summarize(text, min_length=30, max_length=100)
-            if summary:
-                print(f"Ollama summarization success: {len(summary)} characters")
-                return summary
-            else:
-                print("Ollama returned empty result, trying fallbacks...")
+        if not ollama_client.health_check():
+            return None
+        summary = ollama_client.summarize(text, min_length=30, max_length=100,
+                                          keep_alive=OLLAMA_KEEP_ALIVE)
+        if summary:
+            print(f"Ollama summarization success: {len(summary)} characters")
+            return summary
+        print("Ollama returned empty result, trying fallbacks...")
     except Exception as e:
         print(f"Ollama error: {str(e)}")
-    
-    # 2. Try using transformers directly if available
+    return None
+
+def _try_transformers(text):
+    """Summarize with a directly loaded BART pipeline; returns None on failure"""
     try:
         print("Attempting to use transformers directly...")
-        import torch
-        from transformers import pipeline
+        summarizer = _get_bart_pipeline()
         
-        # Use a smaller, faster model for testing
-        device = 0 if torch.cuda.is_available() else -1
-        try:
-            print("Loading BART model...")
-            summarizer = pipeline("summarization", model="facebook/bart-base", device=device)
-            
-            # Split text into chunks if it's too long
-            max_chunk_length = 1024
-            chunks = [text[i:i+max_chunk_length] for i in range(0, len(text), max_chunk_length)]
-            
-            summaries = []
-            for chunk in chunks:
-                if len(chunk.split()) < 20:  # Skip very short chunks
-                    continue
-                
-                result = summarizer(chunk, max_length=100, min_length=30, do_sample=False)
-                summaries.append(result[0]['summary_text'])
-            
-            # Combine the summaries
-            final_summary = " ".join(summaries)
-            print(f"Direct transformers summarization complete: {len(final_summary)} chars")
-            return final_summary
+        # Split text into chunks if it's too long
+        max_chunk_length = 1024
+        chunks = [text[i:i+max_chunk_length] for i in range(0, len(text), max_chunk_length)]
+        
+        summaries = []
+        for chunk in chunks:
+            if len(chunk.split()) < 20:  # Skip very short chunks
+                continue
             
-        except Exception as transformer_error:
-            print(f"Error with transformer model: {str(transformer_error)}")
+            result = summarizer(chunk, max_length=100, min_length=30, do_sample=False)
+            summaries.append(result[0]['summary_text'])
+        
+        # Combine the summaries
+        final_summary = " ".join(summaries)
+        print(f"Direct transformers summarization complete: {len(final_summary)} chars")
+        return final_summary
     except ImportError:
         print("Transformers library not available")
-    
-    # 3. Try VideoSummarizer as last ML option
+    except Exception as transformer_error:
+        print(f"Error with transformer model: {str(transformer_error)}")
+    return None
+
+def _try_video_summarizer(text):
+    """Summarize with VideoSummarizer as the last ML option; returns None on failure"""
     try:
         print("Attempting to use VideoSummarizer...")
+        from flask import Flask
+        from app.summarizer.processor import VideoSummarizer
+        
         app = Flask(__name__)
         app.config['TESTING'] = True
         with app.app_context():
@@ -209,33 +284,94 @@ def summarize_from_text(text):
             if result != text:  # Check if it actually summarized
                 print(f"VideoSummarizer result: {len(result)} characters")
                 return result
-            else:
-                print("VideoSummarizer returned original text, using fallback...")
+            print("VideoSummarizer returned original text, using fallback...")
     except Exception as e:
         print(f"VideoSummarizer error: {str(e)}")
-    
-    # 4. Final fallback: use simple summarization
+    return None
+
+def _try_simple(text):
+    """Final fallback: use simple summarization"""
     print("All ML summarization methods failed, using simple summarization...")
     return simple_summarize(text, max_sentences=3)
 
-def main():
-    parser = argparse.ArgumentParser(description="Simple video processing test")
-    parser.add_argument("video_path", help="Path to the video file")
-    parser.add_argument("--duration", type=int, default=5, help="Duration in seconds to extract")
-    parser.add_argument("--timeout", type=int, default=60, help="Timeout for each operation in seconds")
-    parser.add_argument("--text", help="Test text to summarize directly (skips video processing)")
-    args = parser.parse_args()
+# Tried in order; each strategy does its own lazy imports so later ones cost nothing
+# once an earlier one succeeds
+SUMMARIZATION_STRATEGIES = (_try_ollama, _try_transformers, _try_video_summarizer, _try_simple)
+
+def summarize_from_text(text):
+    """Directly test summarization from a given text"""
+    print(f"Summarizing text of length {len(text)} characters...")
     
-    global TIMEOUT
-    TIMEOUT = args.timeout
+    for strategy in SUMMARIZATION_STRATEGIES:
+        result = strategy(text)
+        if result:
+            return result
+    return None
+
+def _preload_bart():
+    """Load and warm the BART pipeline, reporting instead of raising on failure"""
+    try:
+        _get_bart_pipeline()
+        print("BART model pre-warmed")
+    except Exception as e:
+        print(f"BART pre-warm failed: {str(e)}")
+
+def _run_in_daemon_thread(func):
+    """Run func on a daemon thread and return a future for its result
+    
+    A timed-out call can't be stopped. The default executor would still be joined
+    by asyncio.run and at interpreter exit; an abandoned daemon thread is not.
+    """
+    loop = asyncio.get_running_loop()
+    future = loop.create_future()
+    
+    def _settle(setter, value):
+        # The caller may have given up (cancelled the future) before we finished
+        if not future.done():
+            setter(value)
+    
+    def _worker():
+        try:
+            result = func()
+        except BaseException as e:
+            settle = (future.set_exception, e)
+        else:
+            settle = (future.set_result, result)
+        try:
+            loop.call_soon_threadsafe(_settle, *settle)
+        except RuntimeError:
+            # The event loop has already closed
+            pass
     
+    threading.Thread(target=_worker, name=func.__name__, daemon=True).start()
+    return future
+
+async def _probe_and_prewarm(pre_warm):
+    """Probe Ollama and, optionally, load BART at the same time in worker threads"""
+    loop = asyncio.get_running_loop()
+    ollama_task = asyncio.wait_for(_run_in_daemon_thread(test_ollama_summarization), TIMEOUT)
+    tasks = [ollama_task]
+    if pre_warm:
+        tasks.append(loop.run_in_executor(None, _preload_bart))
+    
+    results = await asyncio.gather(*tasks, return_exceptions=True)
+    ollama_available = results[0]
+    if isinstance(ollama_available, asyncio.TimeoutError):
+        print("Ollama probe timed out!")
+        return False
+    if isinstance(ollama_available, BaseException):
+        print(f"Error testing Ollama: {str(ollama_available)}")
+        return False
+    return ollama_available
+
+async def _amain(args):
     print("\n===================================================")
     print("TESTING COMPONENTS INDIVIDUALLY")
     print("===================================================\n")
     
-    # First test if Ollama is available
+    # First test if Ollama is available, overlapping the BART load when requested
     print("\nTESTING OLLAMA:")
-    ollama_available = run_with_timeout(test_ollama_summarization, TIMEOUT)
+    ollama_available = await _probe_and_prewarm(args.pre_warm)
     print(f"Ollama available: {ollama_available}")
     
     # If text is provided, test summarization directly
@@ -311,5 +447,20 @@ def main():
         traceback.print_exc()
         return 1
 
+def main():
+    parser = argparse.ArgumentParser(description="Simple video processing test")
+    parser.add_argument("video_path", help="Path to the video file")
+    parser.add_argument("--duration", type=int, default=5, help="Duration in seconds to extract")
+    parser.add_argument("--timeout", type=int, default=60, help="Timeout for each operation in seconds")
+    parser.add_argument("--text", help="Test text to summarize directly (skips video processing)")
+    parser.add_argument("--pre-warm", action="store_true",
+                        help="Load the BART model while probing Ollama")
+    args = parser.parse_args()
+    
+    global TIMEOUT
+    TIMEOUT = args.timeout
+    
+    return asyncio.run(_amain(args))
+
 if __name__ == "__main__":
     sys.exit(main()) 
\ No newline at end of file
@@ -4,6 +4,9 @@ import sys
 import json
 import time
 import argparse
+import shutil
+import subprocess
+import tempfile
 import requests
 from pathlib import Path
 
@@ -16,6 +19,30 @@ This script:
 4. Displays the summarization results
 """
 
+# ffmpeg output settings for --transcode; the upload endpoint only accepts its own extension list,
+# so audio-only output goes into a webm container
+TRANSCODE_PROFILES = {
+    'audio': ('.webm', ['-vn', '-c:a', 'libopus', '-b:a', '24k']),
+    'video': ('.mp4', ['-c:v', 'libx264', '-crf', '32', '-preset', 'ultrafast', '-c:a', 'aac', '-b:a', '64k']),
+}
+
+def transcode_for_upload(video_path, mode, output_dir):
+    """Re-encode the video to a much smaller file for upload; returns the new path or None"""
+    suffix, codec_args = TRANSCODE_PROFILES[mode]
+    output_path = Path(output_dir) / (video_path.stem + suffix)
+    cmd = ['ffmpeg', '-v', 'error', '-i', str(video_path), *codec_args, str(output_path), '-y']
+    
+    result = subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    if result.returncode != 0:
+        print(f"Error transcoding video: {result.stderr}")
+        return None
+    
+    original_size = video_path.stat().st_size
+    new_size = output_path.stat().st_size
+    print(f"Transcoded ({mode}): {original_size} -> {new_size} bytes "
+          f"({original_size / max(new_size, 1):.1f}x smaller)")
+    return output_path
+
 def main():
     # Parse command line arguments
     parser = argparse.ArgumentParser(description="Test the video summarization API")
@@ -25,6 +52,8 @@ def main():
                        help="Summary length")
     parser.add_argument("--format", choices=["paragraph", "bullets", "numbered", "key_points"], 
                        default="bullets", help="Summary format")
+    parser.add_argument("--transcode", choices=sorted(TRANSCODE_PROFILES),
+                       help="Shrink the file with ffmpeg before upload (audio-only or low-bitrate video)")
     args = parser.parse_args()
     
     # Check if video file exists
@@ -36,13 +65,27 @@ def main():
     base_url = args.server
     
     # Step 1: Upload the video
-    print(f"\n1. Uploading video: {video_path}")
-    with open(video_path, 'rb') as video_file:
-        files = {'file': (video_path.name, video_file)}
-        upload_response = requests.post(
-            f"{base_url}/video/upload",
-            files=files
-        )
+    temp_dir = None
+    if args.transcode:
+        temp_dir = tempfile.mkdtemp()
+        upload_path = transcode_for_upload(video_path, args.transcode, temp_dir)
+        if upload_path is None:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+            return 1
+    else:
+        upload_path = video_path
+    
+    print(f"\n1. Uploading video: {upload_path}")
+    try:
+        with open(upload_path, 'rb') as video_file:
+            files = {'file': (upload_path.name, video_file)}
+            upload_response = requests.post(
+                f"{base_url}/video/upload",
+                files=files
+            )
+    finally:
+        if temp_dir:
+            shutil.rmtree(temp_dir, ignore_errors=True)
     
     if upload_response.status_code != 200:
         print(f"Error uploading video: {upload_response.status_code}")
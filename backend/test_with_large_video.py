@@ -3,20 +3,30 @@ import os
 import sys
 import json
 import argparse
+import itertools
 import subprocess
 import logging
 import time
 import threading
-from app.summarizer.processor import VideoSummarizer, IN_TEST_MODE, TEST_VALIDATE_LOW_SAMPLE_RATE
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from logging.handlers import RotatingFileHandler
+import app.summarizer.processor as processor_module
+from app.summarizer.processor import VideoSummarizer
 from flask import Flask, current_app
 
+# Keep the log file bounded across runs; DEBUG output only goes to the console
+file_handler = RotatingFileHandler('video_processing.log', maxBytes=10 * 1024 * 1024, backupCount=3)
+file_handler.setLevel(logging.INFO)
+
 # Set up logging with more detailed format
 logging.basicConfig(
     level=logging.DEBUG,  # Set to DEBUG for maximum verbosity
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
     handlers=[
         logging.StreamHandler(),
-        logging.FileHandler('video_processing.log')
+        file_handler
     ]
 )
 
@@ -40,44 +50,78 @@ def create_app_context():
     app.logger.setLevel(logging.DEBUG)
     return app
 
-def extract_segment(video_path, output_path, duration=60):
-    """Extract a segment from the video for faster testing"""
-    logger.info(f"Extracting {duration} second segment from {video_path}")
+# Audio format VideoSummarizer.extract_audio produces, including its speech-band filter chain
+SAMPLE_RATE = 16000
+AUDIO_FILTERS = 'highpass=f=200,lowpass=f=3000,volume=2'
+
+# Extensions picked up by --input-dir
+VIDEO_EXTENSIONS = ('.mp4', '.mkv', '.mov', '.avi', '.webm')
+
+# Byte-count scale factors for the size log lines
+_INV_KB = 1.0 / 1024.0
+_INV_MB = _INV_KB * _INV_KB
+
+def extract_segment_pcm(video_path, duration=None, start=0.0):
+    """Decode a segment's audio straight into 16 kHz mono float32 PCM in memory"""
+    logger.info("Decoding %s seconds of audio from %s", duration if duration else 'all', video_path)
     
-    cmd = [
-        'ffmpeg',
+    # -ss before -i seeks on the input (jump to the nearest keyframe) instead of decoding from the start
+    cmd = ['ffmpeg', '-v', 'quiet', '-ss', str(start)]
+    if duration:
+        cmd += ['-t', str(duration)]
+    cmd += [
         '-i', video_path,
-        '-t', str(duration),
-        '-c:v', 'copy',
-        '-c:a', 'copy',
-        output_path,
-        '-y'  # Overwrite if exists
+        '-vn',
+        '-af', AUDIO_FILTERS,
+        '-f', 'f32le',
+        '-ar', str(SAMPLE_RATE),
+        '-ac', '1',
+        'pipe:1'
     ]
     
-    logger.info(f"Running command: {' '.join(cmd)}")
-    result = subprocess.run(cmd, capture_output=True, text=True)
-    
-    if result.returncode != 0:
-        logger.error(f"Error extracting segment: {result.stderr}")
-        return False
+    logger.info("Running command: %s", ' '.join(cmd))
+    # Read the PCM in 64 KiB chunks as ffmpeg produces it; stderr is discarded (-v quiet)
+    process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, bufsize=1 << 20)
+    buffer = bytearray()
+    for chunk in iter(lambda: process.stdout.read(1 << 16), b""):
+        buffer += chunk
+    process.stdout.close()
+    if process.wait() != 0:
+        raise subprocess.CalledProcessError(process.returncode, cmd)
+    pcm = np.frombuffer(buffer, dtype=np.float32)
     
-    logger.info(f"Successfully extracted segment to {output_path}")
-    logger.info(f"Segment file size: {os.path.getsize(output_path)} bytes")
-    return True
+    logger.info("Decoded %d samples (%.2f seconds)", len(pcm), len(pcm) / SAMPLE_RATE)
+    return pcm
+
+# Serializes console output between the step banners and the spinner thread
+_stdout_lock = threading.Lock()
+
+# Clear the spinner's line before a message overwrites it (only meaningful on a terminal)
+_CLEAR_LINE = "\r\x1b[2K" if sys.stdout.isatty() else ""
+
+def _emit(*lines):
+    """Write one or more lines to stdout with a single write call"""
+    with _stdout_lock:
+        sys.stdout.write(_CLEAR_LINE + "\n".join(lines) + "\n")
+        sys.stdout.flush()
+
+def _banner(step, msg):
+    """Print a processing step banner"""
+    _emit(f"Step {step}: {msg}")
 
 def log_progress_indicator():
     """Print a progress indicator every few seconds"""
-    i = 0
-    symbols = "|/-\\"
-    while not progress_done.is_set():
-        sys.stdout.write(f"\rProcessing... {symbols[i % len(symbols)]}")
-        sys.stdout.flush()
-        i += 1
-        time.sleep(0.5)
+    for symbol in itertools.cycle("|/-\\"):
+        with _stdout_lock:
+            sys.stdout.write(f"\rProcessing... {symbol}")
+            sys.stdout.flush()
+        if progress_done.wait(5.0):
+            break
     
     # Clear the progress indicator line when done
-    sys.stdout.write("\r" + " " * 20 + "\r")
-    sys.stdout.flush()
+    with _stdout_lock:
+        sys.stdout.write("\r" + " " * 20 + "\r")
+        sys.stdout.flush()
 
 # Add a monkey patch to the VideoSummarizer to add more logging
 original_process_video = VideoSummarizer.process_video
@@ -85,125 +129,117 @@ def verbose_process_video(self, video_path, options=None):
     """Monkey-patched version of process_video with more logging"""
     logger.info("=" * 50)
     logger.info("STARTING VIDEO PROCESSING")
-    logger.info(f"Video path: {video_path}")
-    logger.info(f"Options: {options}")
+    logger.info("Video path: %s", video_path)
+    logger.info("Options: %s", options)
     logger.info("=" * 50)
     
     # Log video file details
-    file_size = os.path.getsize(video_path)
-    logger.info(f"Video file size: {file_size} bytes ({file_size/1024/1024:.2f} MB)")
+    file_size = os.stat(video_path).st_size
+    file_size_mb = file_size * _INV_MB
+    logger.info("Video file size: %d bytes (%.2f MB)", file_size, file_size_mb)
     
     # Print start of process
-    print("\n--- Starting Video Processing ---")
-    print(f"Video: {video_path}")
-    print(f"File size: {file_size/1024/1024:.2f} MB")
+    _emit("\n--- Starting Video Processing ---",
+          f"Video: {video_path}",
+          f"File size: {file_size_mb:.2f} MB")
     
     try:
         # Log each step of the process
         logger.info("Step 1: Extracting audio from video")
-        print("Step 1: Extracting audio from video...")
+        _banner(1, "Extracting audio from video...")
         
-        # Extract audio (original method extracted from the process_video method)
-        audio_path = self.extract_audio(video_path)
-        logger.info(f"Audio extracted to: {audio_path}")
-        logger.info(f"Audio file size: {os.path.getsize(audio_path)} bytes")
-        print(f"   Audio extracted successfully ({os.path.getsize(audio_path)/1024:.2f} KB)")
+        # Decode the (optionally trimmed) audio once, straight to PCM, instead of
+        # cutting an intermediate video file and decoding it again
+        segment_start = options.get('segment_start', 0.0) if options else 0.0
+        segment_duration = options.get('segment_duration') if options else None
+        pcm = extract_segment_pcm(video_path, segment_duration, segment_start)
         
-        # Validate audio
-        logger.info("Step 2: Validating audio file")
-        print("Step 2: Validating audio file...")
-        from app.summarizer.processor import validate_audio
-        if not validate_audio(audio_path):
-            logger.error("Audio validation failed")
-            print("   Audio validation failed!")
-            raise Exception("Invalid audio extracted from video")
-        logger.info("Audio validation passed")
-        print("   Audio validation passed!")
+        _emit(f"   Audio extracted successfully ({pcm.nbytes * _INV_KB:.2f} KB in memory)")
         
-        # Transcribe audio
-        logger.info("Step 3: Transcribing audio")
-        print("Step 3: Transcribing audio (this may take a while)...")
-        from app.summarizer.processor import transcribe_audio_enhanced
-        transcription = transcribe_audio_enhanced(audio_path)
-        logger.info(f"Transcription complete: {len(transcription)} characters")
-        logger.info(f"Transcription sample: {transcription[:100]}...")
-        print(f"   Transcription complete: {len(transcription)} characters")
+        # Validate and transcribe straight from the in-memory buffer
+        logger.info("Step 2: Validating and transcribing audio")
+        _banner(2, "Validating and transcribing audio (this may take a while)...")
+        from app.summarizer.pcm_pipeline import process_pcm
+        transcription = process_pcm(pcm, SAMPLE_RATE)["transcription"]
+        logger.info("Transcription complete: %d characters", len(transcription))
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("Transcription sample: %s...", transcription[:100])
+        _emit(f"   Transcription complete: {len(transcription)} characters")
         
         # Summarize text
-        logger.info("Step 4: Summarizing transcription")
-        print("Step 4: Summarizing transcription...")
+        logger.info("Step 3: Summarizing transcription")
+        _banner(3, "Summarizing transcription...")
         
         min_length = options.get('min_length', 50) if options else 50
         max_length = options.get('max_length', 150) if options else 150
         
-        logger.info(f"Summary parameters: min_length={min_length}, max_length={max_length}")
+        logger.info("Summary parameters: min_length=%d, max_length=%d", min_length, max_length)
         summary = self.summarize_text(transcription, min_length=min_length, max_length=max_length)
-        logger.info(f"Summary complete: {len(summary)} characters")
-        logger.info(f"Summary sample: {summary[:100]}...")
-        print(f"   Summary complete: {len(summary)} characters")
-        
-        # Clean up
-        logger.info("Step 5: Cleaning up temporary files")
-        print("Step 5: Cleaning up temporary files...")
-        if os.path.exists(audio_path):
-            os.unlink(audio_path)
-            logger.info(f"Removed temporary audio file: {audio_path}")
-            print(f"   Removed temporary audio file")
+        logger.info("Summary complete: %d characters", len(summary))
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("Summary sample: %s...", summary[:100])
+        _emit(f"   Summary complete: {len(summary)} characters")
         
         logger.info("Video processing completed successfully")
-        print("Video processing completed successfully!")
+        _emit("Video processing completed successfully!")
         
         return {
             "transcript": transcription,
             "summary": summary
         }
     except Exception as e:
-        logger.exception(f"Error in process_video: {str(e)}")
-        print(f"\nERROR in processing: {str(e)}")
+        logger.exception("Error in process_video: %s", e)
+        _emit(f"\nERROR in processing: {str(e)}")
         # If we're in a test environment, we might want to re-raise this
         # for easier debugging, but in production we'll handle it gracefully
-        if IN_TEST_MODE:
+        if processor_module.in_test_mode():
             raise
         return {
             "transcript": f"Error: {str(e)}",
             "summary": f"Failed to process video due to error: {str(e)}"
         }
 
-# Replace the original method with our verbose version
-VideoSummarizer.process_video = verbose_process_video
+# Replace the original method with our verbose version, but only when run as a
+# script (or explicitly requested) so importing this module leaves VideoSummarizer alone
+if __name__ == '__main__' or os.environ.get('SVS_VERBOSE_PROCESS'):
+    VideoSummarizer.process_video = verbose_process_video
 
 # Global flag for progress indicator
 progress_done = threading.Event()
 
-def main():
-    # Parse command line arguments
-    parser = argparse.ArgumentParser(description="Test video summarization directly")
-    parser.add_argument("video_path", help="Path to the video file to summarize")
-    parser.add_argument("--duration", type=int, default=60, 
-                       help="Duration of video segment to process (in seconds)")
-    parser.add_argument("--length", choices=["short", "medium", "long"], default="medium", 
-                       help="Summary length")
-    parser.add_argument("--format", choices=["paragraph", "bullets", "numbered", "key_points"], 
-                       default="bullets", help="Summary format")
-    parser.add_argument("--full", action="store_true",
-                       help="Process the full video instead of just a segment")
-    args = parser.parse_args()
+# The spinner is only useful on an interactive terminal; in CI or log files it is pure overhead,
+# and with DEBUG logging on the console it would interleave with the log lines
+_SPINNER_ENABLED = (sys.stdout.isatty() and not processor_module.in_test_mode()
+                    and not logger.isEnabledFor(logging.DEBUG))
+
+# Per-process Flask app and summarizer, created once by _init_worker
+_worker_app = None
+_worker_summarizer = None
+
+def _init_worker(spinner=False):
+    """Create the Flask app context and VideoSummarizer once for this process"""
+    global _worker_app, _worker_summarizer, _SPINNER_ENABLED
+    # Pool workers may be spawned rather than forked, so install the verbose path here too
+    VideoSummarizer.process_video = verbose_process_video
+    # Several workers writing a spinner to one terminal would only garble it
+    _SPINNER_ENABLED = _SPINNER_ENABLED and spinner
     
+    _worker_app = create_app_context()
+    _worker_app.app_context().push()
+    logger.info("Initializing VideoSummarizer")
+    print("Initializing VideoSummarizer...")
+    _worker_summarizer = VideoSummarizer()
+    logger.info("VideoSummarizer initialized")
+
+def _run_one(video_path, args):
+    """Summarize a single video and return the exit code for it"""
     # Check if video file exists
-    if not os.path.exists(args.video_path):
-        logger.error(f"Video file not found: {args.video_path}")
+    try:
+        video_stat = os.stat(video_path)
+    except FileNotFoundError:
+        logger.error("Video file not found: %s", video_path)
         return 1
     
-    # Extract a segment for faster processing if not processing the full video
-    video_to_process = args.video_path
-    if not args.full:
-        segment_path = f"segment_{int(time.time())}.mp4"
-        if not extract_segment(args.video_path, segment_path, args.duration):
-            logger.error("Failed to extract video segment. Trying to process the full video instead.")
-        else:
-            video_to_process = segment_path
-            logger.info(f"Using extracted segment: {segment_path}")
-    
     # Set up summarization options
     options = {
         "length": args.length,
@@ -213,100 +249,146 @@ def main():
         "max_length": 100 if args.length == "short" else (250 if args.length == "long" else 150)
     }
     
+    # Only decode a segment for faster processing if not processing the full video
+    if not args.full:
+        options["segment_start"] = args.start
+        options["segment_duration"] = args.duration
+    
     logger.info("=" * 70)
     logger.info("STARTING VIDEO SUMMARIZATION PROCESS")
-    logger.info(f"Video: {video_to_process}")
-    logger.info(f"Options: {json.dumps(options, indent=2)}")
+    logger.info("Video: %s (%d bytes)", video_path, video_stat.st_size)
+    options_json = json.dumps(options, indent=2)
+    logger.info("Options: %s", options_json)
     logger.info("=" * 70)
     
     print("\n==========================================================")
     print("PROCESSING VIDEO DIRECTLY")
     print("==========================================================")
-    print(f"Video: {video_to_process}")
-    print(f"Options: {json.dumps(options, indent=2)}")
+    print(f"Video: {video_path}")
+    print(f"Options: {options_json}")
     if not args.full:
-        print(f"Processing only the first {args.duration} seconds of the video")
+        print(f"Processing only {args.duration} seconds of the video starting at {args.start}s")
     print("==========================================================\n")
     
-    # Create app context
-    app = create_app_context()
-    with app.app_context():
-        try:
-            # Initialize VideoSummarizer
-            logger.info("Initializing VideoSummarizer")
-            print("Initializing VideoSummarizer...")
-            summarizer = VideoSummarizer()
-            logger.info("VideoSummarizer initialized")
-            
-            # Start progress indicator in a separate thread
-            progress_done.clear()
+    try:
+        # Outside a pool (single video), set up the app and summarizer here
+        if _worker_summarizer is None:
+            _init_worker(spinner=True)
+        
+        # Start progress indicator in a separate thread
+        progress_done.clear()
+        progress_thread = None
+        if _SPINNER_ENABLED:
             progress_thread = threading.Thread(target=log_progress_indicator)
             progress_thread.daemon = True
             progress_thread.start()
+        
+        # Process the video
+        logger.info("Starting video processing")
+        print("Starting video processing (this may take a while)...")
+        
+        start_time = time.time()
+        result = _worker_summarizer.process_video(video_path, options)
+        end_time = time.time()
+        
+        # Stop progress indicator
+        progress_done.set()
+        if progress_thread:
+            progress_thread.join()
+        
+        processing_time = end_time - start_time
+        logger.info("Video processing completed in %.2f seconds", processing_time)
+        
+        # Display results
+        print("\n==========================================================")
+        print("VIDEO SUMMARIZATION RESULTS")
+        print(f"Processing time: {processing_time:.2f} seconds")
+        print("==========================================================")
+        
+        if result and 'transcript' in result:
+            transcript = result.get('transcript', 'No transcript available')
+            summary = result.get('summary', 'No summary available')
             
-            # Process the video
-            logger.info("Starting video processing")
-            print("Starting video processing (this may take a while)...")
-            
-            start_time = time.time()
-            result = summarizer.process_video(video_to_process, options)
-            end_time = time.time()
+            logger.info("Transcript length: %d characters", len(transcript))
+            logger.info("Summary length: %d characters", len(summary))
             
-            # Stop progress indicator
-            progress_done.set()
-            progress_thread.join()
+            print("\nTRANSCRIPT:")
+            print("----------------------------------------------------------")
+            print(transcript)
             
-            processing_time = end_time - start_time
-            logger.info(f"Video processing completed in {processing_time:.2f} seconds")
+            print("\nSUMMARY:")
+            print("----------------------------------------------------------")
+            print(summary)
             
-            # Display results
             print("\n==========================================================")
-            print("VIDEO SUMMARIZATION RESULTS")
-            print(f"Processing time: {processing_time:.2f} seconds")
-            print("==========================================================")
             
-            if result and 'transcript' in result:
-                transcript = result.get('transcript', 'No transcript available')
-                summary = result.get('summary', 'No summary available')
-                
-                logger.info(f"Transcript length: {len(transcript)} characters")
-                logger.info(f"Summary length: {len(summary)} characters")
-                
-                print("\nTRANSCRIPT:")
-                print("----------------------------------------------------------")
-                print(transcript)
-                
-                print("\nSUMMARY:")
-                print("----------------------------------------------------------")
-                print(summary)
-                
-                print("\n==========================================================")
-                
-                # Clean up segment if created
-                if not args.full and os.path.exists(segment_path):
-                    os.remove(segment_path)
-                    logger.info(f"Removed temporary segment file: {segment_path}")
-                
-                return 0
-            else:
-                logger.error(f"Failed to process video. Result: {result}")
-                print("\nERROR: Failed to process video")
-                print(f"Result: {result}")
-                print("\n==========================================================")
-                return 1
-                
-        except Exception as e:
-            # Stop progress indicator if it's running
-            progress_done.set()
-            if 'progress_thread' in locals() and progress_thread.is_alive():
-                progress_thread.join()
-                
-            logger.exception("Error processing video")
-            print(f"\nERROR: {str(e)}")
-            import traceback
-            traceback.print_exc()
+            return 0
+        else:
+            logger.error("Failed to process video. Result: %s", result)
+            print("\nERROR: Failed to process video")
+            print(f"Result: {result}")
             print("\n==========================================================")
             return 1
+            
+    except Exception as e:
+        # Stop progress indicator if it's running
+        progress_done.set()
+        if locals().get('progress_thread') and progress_thread.is_alive():
+            progress_thread.join()
+            
+        logger.exception("Error processing video")
+        print(f"\nERROR: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        print("\n==========================================================")
+        return 1
+
+def main():
+    # Parse command line arguments
+    parser = argparse.ArgumentParser(description="Test video summarization directly")
+    parser.add_argument("video_path", nargs="?", help="Path to the video file to summarize")
+    parser.add_argument("--input-dir",
+                       help="Summarize every video in this directory instead of a single file")
+    parser.add_argument("--jobs", type=int,
+                       help="Number of worker processes to use with --input-dir (default: 1)")
+    parser.add_argument("--duration", type=int, default=60, 
+                       help="Duration of video segment to process (in seconds)")
+    parser.add_argument("--start", type=float, default=0.0,
+                       help="Offset into the video where the segment starts (in seconds)")
+    parser.add_argument("--length", choices=["short", "medium", "long"], default="medium", 
+                       help="Summary length")
+    parser.add_argument("--format", choices=["paragraph", "bullets", "numbered", "key_points"], 
+                       default="bullets", help="Summary format")
+    parser.add_argument("--full", action="store_true",
+                       help="Process the full video instead of just a segment")
+    args = parser.parse_args()
+    
+    if args.jobs is not None and not args.input_dir:
+        parser.error("--jobs requires --input-dir")
+    
+    if not args.input_dir:
+        if not args.video_path:
+            parser.error("either video_path or --input-dir is required")
+        return _run_one(args.video_path, args)
+    
+    video_files = sorted(
+        entry.path for entry in os.scandir(args.input_dir)
+        if entry.is_file() and os.path.splitext(entry.name)[1].lower() in VIDEO_EXTENSIONS
+    )
+    if not video_files:
+        logger.error("No video files found in %s", args.input_dir)
+        return 1
+    
+    # Each worker pays for Flask and the summarizer models once, not once per video
+    failures = 0
+    with ProcessPoolExecutor(max_workers=max(1, args.jobs or 1), initializer=_init_worker) as pool:
+        for video_path, exit_code in zip(video_files, pool.map(partial(_run_one, args=args), video_files, chunksize=1)):
+            if exit_code != 0:
+                logger.error("Failed to summarize %s", video_path)
+                failures += 1
+    
+    print(f"\nSummarized {len(video_files) - failures} of {len(video_files)} videos")
+    return 1 if failures else 0
 
 if __name__ == "__main__":
     sys.exit(main()) 
\ No newline at end of file
@@ -1,19 +1,32 @@
 #!/usr/bin/env python3
 """
-Test the transcription endpoint with a YouTube video
-This script downloads a YouTube video, extracts the audio, and sends it to the transcription API
+Test the transcription endpoint with YouTube videos
+This script downloads one or more YouTube videos, extracts the audio, and sends it to the transcription API
 """
 
 import os
 import sys
+import hashlib
 import json
+import shutil
 import tempfile
 import requests
 import logging
+import mmap
 import subprocess
 import argparse
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from urllib.parse import urlparse, parse_qs
 
+try:
+    # Optional: streams the multipart body instead of building it in memory
+    from requests_toolbelt import MultipartEncoder
+except ImportError:
+    MultipartEncoder = None
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -24,32 +37,45 @@ logger = logging.getLogger(__name__)
 # Default API URL
 API_URL = "http://localhost:8080/api/transcribe"
 
-def check_dependencies():
-    """Check if required dependencies are installed"""
-    # Check yt-dlp
-    try:
-        subprocess.run(["yt-dlp", "--version"], 
-                      stdout=subprocess.PIPE, 
-                      stderr=subprocess.PIPE, 
-                      check=True)
-        logger.info("yt-dlp is installed")
-    except (subprocess.SubprocessError, FileNotFoundError):
-        logger.error("yt-dlp is not installed. Please install it with: pip install yt-dlp")
-        return False
-        
-    # Check ffmpeg
-    try:
-        subprocess.run(["ffmpeg", "-version"], 
-                      stdout=subprocess.PIPE, 
-                      stderr=subprocess.PIPE, 
-                      check=True)
-        logger.info("ffmpeg is installed")
-    except (subprocess.SubprocessError, FileNotFoundError):
-        logger.error("ffmpeg is not installed. Please install it first.")
+# Transcription results keyed by audio content, so repeat runs skip the server round trip
+CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "svs_transcribe")
+
+# Required binaries, their version flag and how to install them
+DEPENDENCIES = (
+    ("yt-dlp", "--version", "Please install it with: pip install yt-dlp"),
+    ("ffmpeg", "-version", "Please install it first."),
+)
+
+@lru_cache(maxsize=None)
+def check_dependencies(verbose=False):
+    """Check if required dependencies are installed (the result, including a
+    failure, is cached for the lifetime of the process)
+    
+    Only looks the binaries up on PATH; with verbose=True each one is also run
+    to log its version.
+    """
+    missing = [name for name, _, _ in DEPENDENCIES if not shutil.which(name)]
+    if missing:
+        for name, _, hint in DEPENDENCIES:
+            if name in missing:
+                logger.error("%s is not installed. %s", name, hint)
         return False
-        
+    
+    if verbose:
+        for name, version_flag, _ in DEPENDENCIES:
+            try:
+                result = subprocess.run([name, version_flag],
+                                        stdout=subprocess.PIPE,
+                                        stderr=subprocess.PIPE,
+                                        text=True,
+                                        check=True)
+                logger.info("%s: %s", name, result.stdout.splitlines()[0] if result.stdout else "unknown version")
+            except subprocess.SubprocessError as e:
+                logger.warning("Could not get %s version: %s", name, e)
+    
     return True
 
+@lru_cache(maxsize=4096)
 def extract_youtube_id(url):
     """Extract YouTube video ID from URL"""
     if "youtu.be" in url:
@@ -65,46 +91,70 @@ def extract_youtube_id(url):
         # Direct ID or unknown format
         return url.strip()
 
-def download_audio(youtube_url, output_path=None):
-    """Download audio from YouTube URL"""
-    if not output_path:
-        # Create a temporary file with timestamp for uniqueness
-        import time
-        output_path = os.path.join(tempfile.gettempdir(), f"youtube_audio_{int(time.time())}.wav")
+def iter_downloaded_audio(youtube_urls, output_dir=None):
+    """Download audio for one or more YouTube URLs with a single yt-dlp invocation,
+    yielding each file path as soon as yt-dlp has finished it"""
+    if isinstance(youtube_urls, str):
+        youtube_urls = [youtube_urls]
+    if not output_dir:
+        output_dir = tempfile.mkdtemp(prefix="youtube_audio_")
     
-    logger.info(f"Downloading audio from YouTube URL: {youtube_url}")
+    logger.info(f"Downloading audio from {len(youtube_urls)} YouTube URL(s)")
     
-    # Extract YouTube ID to verify it's a valid URL
-    video_id = extract_youtube_id(youtube_url)
-    if not video_id:
-        logger.error("Invalid YouTube URL or ID")
-        return None
+    # Extract YouTube IDs to verify they are valid URLs
+    valid_urls = [url for url in youtube_urls if extract_youtube_id(url)]
+    if len(valid_urls) != len(youtube_urls):
+        logger.error("Skipping invalid YouTube URL(s) or ID(s)")
+    if not valid_urls:
+        return
     
-    # Command to download audio with high quality and save as WAV
+    # One process for every URL so yt-dlp's startup cost is paid once
     cmd = [
         "yt-dlp",
         "-x",                          # Extract audio
         "--audio-format", "wav",       # Convert to WAV
         "--audio-quality", "0",        # Highest quality
-        "-o", output_path,             # Output path
+        "-o", os.path.join(output_dir, "%(id)s.%(ext)s"),  # One file per video ID
         "--postprocessor-args", "-ar 16000 -ac 1",  # Set audio rate and channels
-        youtube_url
+        "--no-simulate",
+        "--print", "after_move:filepath",  # Report each finished file on stdout
+        *valid_urls
     ]
     
     logger.info(f"Running download command: {' '.join(cmd)}")
     
+    process = subprocess.Popen(cmd, stdout=subprocess.PIPE, text=True)
+    for line in process.stdout:
+        audio_path = line.strip()
+        if audio_path and os.path.exists(audio_path):
+            logger.info(f"Audio downloaded to: {audio_path}")
+            yield audio_path
+    
+    if process.wait() != 0:
+        # Some URLs may still have succeeded, and those were already yielded
+        logger.error(f"Error downloading audio: yt-dlp exited with {process.returncode}")
+
+def download_audio(youtube_urls, output_dir=None):
+    """Download audio for one or more YouTube URLs and return the file paths"""
+    return list(iter_downloaded_audio(youtube_urls, output_dir))
+
+def _probe(audio_path):
+    """Return (sample_rate, channels, codec) of the first audio stream, or None if unknown"""
+    cmd = [
+        "ffprobe", "-v", "error",
+        "-select_streams", "a:0",
+        "-show_entries", "stream=sample_rate,channels,codec_name",
+        "-of", "json",
+        audio_path
+    ]
     try:
-        subprocess.run(cmd, check=True, capture_output=True)
-        if os.path.exists(output_path):
-            logger.info(f"Audio downloaded to: {output_path}")
-            return output_path
-        else:
-            logger.error(f"Download command completed but output file not found: {output_path}")
-            return None
-    except subprocess.CalledProcessError as e:
-        logger.error(f"Error downloading audio: {str(e)}")
-        logger.error(f"yt-dlp stderr: {e.stderr.decode('utf-8', errors='replace')}")
+        streams = json.loads(subprocess.check_output(cmd)).get("streams") or []
+    except (subprocess.SubprocessError, FileNotFoundError, ValueError):
+        return None
+    if not streams:
         return None
+    stream = streams[0]
+    return int(stream.get("sample_rate", 0)), stream.get("channels"), stream.get("codec_name")
 
 def ensure_audio_format(audio_path):
     """Ensure audio format is compatible with speech recognition"""
@@ -114,6 +164,11 @@ def ensure_audio_format(audio_path):
         
     logger.info(f"Ensuring audio format is compatible with speech recognition: {audio_path}")
     
+    # yt-dlp usually produces 16 kHz mono PCM already; skip the re-encode in that case
+    if _probe(audio_path) == (16000, 1, "pcm_s16le"):
+        logger.info(f"Audio is already 16 kHz mono PCM: {audio_path}")
+        return audio_path
+    
     # Create a temporary file for the processed audio
     fd, output_path = tempfile.mkstemp(suffix='.wav')
     os.close(fd)
@@ -132,18 +187,56 @@ def ensure_audio_format(audio_path):
     
     logger.info(f"Processing audio with command: {' '.join(cmd)}")
     
-    try:
-        subprocess.run(cmd, check=True, capture_output=True)
+    # Only the tail of ffmpeg's stderr is kept, so a verbose run cannot balloon memory
+    process = subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    stderr_tail = deque(process.stderr, maxlen=50)
+    process.stderr.close()
+    
+    if process.wait() == 0:
         logger.info(f"Audio processed to: {output_path}")
         return output_path
-    except subprocess.CalledProcessError as e:
-        logger.error(f"Error processing audio: {str(e)}")
-        logger.error(f"ffmpeg stderr: {e.stderr.decode('utf-8', errors='replace')}")
-        if os.path.exists(output_path):
-            os.remove(output_path)
+    
+    logger.error(f"Error processing audio: ffmpeg exited with {process.returncode}")
+    logger.error(f"ffmpeg stderr: {b''.join(stderr_tail).decode('utf-8', errors='replace')}")
+    if os.path.exists(output_path):
+        os.remove(output_path)
+    return None
+
+def _cache_key(audio_path, playback_rate):
+    """Hash the whole audio file (never a sample of it) together with the playback rate"""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(audio_path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return f"{digest.hexdigest()}_{playback_rate}"
+
+def transcribe_audio_cached(audio_path, api_url=API_URL, playback_rate="1.0", use_cache=True):
+    """Return the transcription result for the audio, reusing a cached result for identical content.
+    Returns None if the API call fails."""
+    cache_path = None
+    if use_cache:
+        cache_path = os.path.join(CACHE_DIR, _cache_key(audio_path, playback_rate) + ".json")
+        if os.path.exists(cache_path):
+            logger.info(f"Using cached transcription: {cache_path}")
+            with open(cache_path) as f:
+                return json.load(f)
+    
+    response = transcribe_audio(audio_path, api_url, playback_rate)
+    if response.status_code != 200:
+        logger.error(f"Error response from API: {response.text}")
         return None
+    
+    result = response.json()
+    if cache_path:
+        # Write to a temp file first so a concurrent reader never sees a partial result
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=CACHE_DIR, suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            json.dump(result, f)
+        os.replace(tmp_path, cache_path)
+    return result
 
-def transcribe_audio(audio_path, api_url=API_URL):
+def transcribe_audio(audio_path, api_url=API_URL, playback_rate="1.0"):
     """Send audio to the transcribe endpoint and get result"""
     logger.info(f"Sending audio to transcribe endpoint: {api_url}")
     
@@ -152,48 +245,41 @@ def transcribe_audio(audio_path, api_url=API_URL):
     
     with open(audio_path, "rb") as f:
         logger.info(f"Sending POST request to {api_url}")
-        response = requests.post(
-            api_url,
-            files={"audio": (os.path.basename(audio_path), f, "audio/wav")},
-            data={"playback_rate": "1.0"}
-        )
+        if MultipartEncoder is not None and os.fstat(f.fileno()).st_size > 0:
+            # Let the kernel page the file in as the encoder streams it out
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                encoder = MultipartEncoder(fields={
+                    "audio": (os.path.basename(audio_path), mm, "audio/wav"),
+                    "playback_rate": playback_rate
+                })
+                response = requests.post(
+                    api_url,
+                    data=encoder,
+                    headers={"Content-Type": encoder.content_type}
+                )
+        else:
+            response = requests.post(
+                api_url,
+                files={"audio": (os.path.basename(audio_path), f, "audio/wav")},
+                data={"playback_rate": playback_rate}
+            )
     
     logger.info(f"Response status code: {response.status_code}")
     logger.info(f"Response content: {response.text[:500]}...")  # Show only first 500 chars
     
     return response
 
-def main():
-    """Main function"""
-    parser = argparse.ArgumentParser(description="Test the transcription endpoint with a YouTube video")
-    parser.add_argument("youtube_url", help="YouTube URL or video ID to transcribe")
-    parser.add_argument("--api-url", default=API_URL, help="API URL for the transcription endpoint")
-    args = parser.parse_args()
-    
-    # Check dependencies
-    if not check_dependencies():
-        return 1
-    
-    logger.info(f"Using API URL: {args.api_url}")
-    
-    # Download audio from YouTube
-    audio_path = download_audio(args.youtube_url)
-    if not audio_path:
-        logger.error("Failed to download audio from YouTube")
-        return 1
-    
-    # Process audio to ensure compatibility
-    processed_audio = ensure_audio_format(audio_path)
-    if not processed_audio:
-        logger.error("Failed to process audio format")
-        return 1
-    
-    # Send to transcription API
+# Keeps the multi-line reports of concurrently processed videos from interleaving
+_report_lock = threading.Lock()
+
+def transcribe_and_report(audio_path, api_url, use_cache=True):
+    """Send one processed audio file to the API and print the result"""
     try:
-        response = transcribe_audio(processed_audio, args.api_url)
+        result = transcribe_audio_cached(audio_path, api_url, use_cache=use_cache)
+        if result is None:
+            return False
         
-        if response.status_code == 200:
-            result = response.json()
+        with _report_lock:
             logger.info("Transcription test successful!")
             
             # Print transcription
@@ -219,20 +305,65 @@ def main():
             print("-" * 80)
             print(result.get("summary", "No summary returned"))
             print("-" * 80)
-            
-        else:
-            logger.error(f"Error response from API: {response.text}")
-            return 1
+        return True
     except Exception as e:
         logger.error(f"Error sending audio to transcribe endpoint: {str(e)}")
-        return 1
+        return False
+
+def process_downloaded_audio(audio_path, api_url, use_cache=True):
+    """Re-encode one downloaded file, send it to the API and clean up; returns success"""
+    # Process audio to ensure compatibility
+    processed_audio = ensure_audio_format(audio_path)
+    if not processed_audio:
+        logger.error(f"Failed to process audio format: {audio_path}")
+        return False
+    
+    # Send to transcription API
+    try:
+        return transcribe_and_report(processed_audio, api_url, use_cache)
     finally:
         # Clean up temporary files
-        if 'processed_audio' in locals() and os.path.exists(processed_audio):
+        if os.path.exists(processed_audio):
             os.remove(processed_audio)
             logger.info(f"Removed temporary audio file: {processed_audio}")
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description="Test the transcription endpoint with YouTube videos")
+    parser.add_argument("youtube_urls", nargs="+", help="YouTube URL(s) or video ID(s) to transcribe")
+    parser.add_argument("--api-url", default=API_URL, help="API URL for the transcription endpoint")
+    parser.add_argument("--verbose-deps", action="store_true",
+                        help="Run each dependency to log its version")
+    parser.add_argument("--no-cache", action="store_true",
+                        help=f"Always call the API instead of reusing results cached in {CACHE_DIR}")
+    args = parser.parse_args()
+    
+    # Check dependencies
+    if not check_dependencies(args.verbose_deps):
+        return 1
+    
+    logger.info(f"Using API URL: {args.api_url}")
+    
+    # Download audio for every URL in one go
+    download_dir = tempfile.mkdtemp(prefix="youtube_audio_")
+    try:
+        # Re-encode and transcribe each file while yt-dlp keeps downloading the rest
+        max_workers = min(8, len(args.youtube_urls))
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            futures = [
+                pool.submit(process_downloaded_audio, audio_path, args.api_url, not args.no_cache)
+                for audio_path in iter_downloaded_audio(args.youtube_urls, download_dir)
+            ]
+            succeeded = sum(1 for future in futures if future.result())
+        
+        if not futures:
+            logger.error("Failed to download audio from YouTube")
+            return 1
+        failures = len(args.youtube_urls) - succeeded
+    finally:
+        shutil.rmtree(download_dir, ignore_errors=True)
     
-    return 0
+    return 1 if failures else 0
 
 if __name__ == "__main__":
     sys.exit(main()) 
\ No newline at end of file
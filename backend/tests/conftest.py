@@ -1,16 +1,14 @@
 import pytest
 import os
-import tempfile
 import shutil
-from datetime import datetime, timedelta
 from unittest import mock
+from flask.sessions import SecureCookieSessionInterface
 from app.main import create_app
 from app.config import Config
 from tests.test_helpers import (
     mock_google_auth_response, 
     mock_google_userinfo_response,
     create_test_audio_file,
-    mock_audio_processing_functions,
     mock_extension_headers as helper_mock_extension_headers,
     create_test_video_file,
     mock_video_processing_functions,
@@ -20,16 +18,20 @@ from tests.test_helpers import (
     create_test_error_response,
     create_test_success_response
 )
-from app.summarizer.processor import process_audio
 from tests.test_helpers_validation import (
     validate_audio_file
 )
 
+def pytest_configure(config):
+    """Register the markers used by the shared file fixtures."""
+    config.addinivalue_line('markers', 'mutable_audio_file: give the test its own copy of test_audio_file')
+    config.addinivalue_line('markers', 'mutable_video_file: give the test its own copy of test_video_file')
+
 @pytest.fixture(scope="session")
-def app():
+def app(tmp_path_factory):
     """Create a test Flask application instance."""
-    # Create a temporary directory for test files
-    temp_dir = tempfile.mkdtemp()
+    # Temporary directory for test files; pytest removes it even if setup fails
+    temp_dir = str(tmp_path_factory.mktemp('summaries'))
     
     # Mock environment variables
     env_patcher = mock.patch.dict(os.environ, {
@@ -50,41 +52,56 @@ def app():
         'ALLOWED_ORIGINS': 'http://localhost:3000,chrome-extension://test_extension_id',
         'SUMMARIES_DIR': temp_dir,
         'SECRET_KEY': 'test_secret_key',
-        'SESSION_TYPE': 'filesystem',
+        'SESSION_PERMANENT': False,
         'GOOGLE_CLIENT_SECRETS_FILE': os.path.join(os.path.dirname(__file__), 'dummy_client_secrets.json'),
         'FRONTEND_URL': 'http://localhost:3000',
         'BROWSER_EXTENSION_ID': 'test_extension_id'
     })
+    # create_app installs Flask-Session's filesystem backend; tests keep sessions in
+    # Flask's signed cookie instead so session writes never touch the disk
+    app.session_interface = SecureCookieSessionInterface()
     
-    yield app
+    # Push the application context once for the whole session rather than per test
+    with app.app_context():
+        yield app
     
     # Cleanup
     env_patcher.stop()
-    shutil.rmtree(temp_dir)
 
-@pytest.fixture(scope="function")
-def client(app):
-    """Create a test client for the app with authentication."""
-    client = app.test_client()
-    with client.session_transaction() as sess:
-        sess['user_info'] = {
+# Fixed timestamps keep the authenticated session deterministic across runs
+TEST_SESSION_TIMESTAMP = "2024-01-01T00:00:00"
+TEST_SESSION_EXPIRY = "2024-01-01T01:00:00"
+
+@pytest.fixture(scope="session")
+def _base_session_data():
+    """Authenticated session contents, built once and copied into each test client."""
+    return {
+        'user_info': {
             'email': 'test@example.com',
             'name': 'Test User',
             'picture': 'https://example.com/profile.jpg',
             'email_verified': True
-        }
-        sess['last_activity'] = datetime.utcnow().isoformat()
-        sess['extension_jobs'] = {}
-        sess['oauth_state'] = 'test_state'
-        sess['credentials'] = {
+        },
+        'last_activity': TEST_SESSION_TIMESTAMP,
+        'extension_jobs': {},
+        'oauth_state': 'test_state',
+        'credentials': {
             'token': 'test_token',
             'refresh_token': 'test_refresh_token',
             'token_uri': 'https://oauth2.googleapis.com/token',
             'client_id': 'test_client_id',
             'client_secret': 'test_client_secret',
             'scopes': ['profile', 'email'],
-            'expiry': (datetime.utcnow() + timedelta(hours=1)).isoformat()
+            'expiry': TEST_SESSION_EXPIRY
         }
+    }
+
+@pytest.fixture(scope="function")
+def client(app, _base_session_data):
+    """Create a test client for the app with authentication."""
+    client = app.test_client()
+    with client.session_transaction() as sess:
+        sess.update(_base_session_data)
     return client
 
 @pytest.fixture(scope="function")
@@ -108,9 +125,18 @@ def mock_google_userinfo():
         yield mock_get
 
 @pytest.fixture(scope="function")
-def mock_audio_processing():
-    """Mock audio processing functions."""
-    yield mock_audio_processing_functions()
+def mock_audio_processing(monkeypatch):
+    """Mock audio processing with a successful canned result."""
+    def mock_process(audio_path, options=None):
+        return {
+            'success': True,
+            'transcription': 'This is a test transcription.',
+            'summary': 'This is a test summary.'
+        }
+    
+    # The API routes import process_audio by name, so patch it where they look it up
+    monkeypatch.setattr('app.api.routes.process_audio', mock_process)
+    yield mock_process
 
 @pytest.fixture(scope="function")
 def mock_video_processing():
@@ -127,19 +153,35 @@ def mock_extension_headers(mock_extension_id):
     """Create headers for extension requests."""
     return helper_mock_extension_headers(mock_extension_id)
 
+@pytest.fixture(scope="session")
+def session_audio_file(tmp_path_factory):
+    """Create the deterministic test audio file once per session."""
+    audio_path, _ = create_test_audio_file(
+        duration=5, sample_rate=16000, dir=str(tmp_path_factory.mktemp('audio'))
+    )
+    return audio_path
+
+@pytest.fixture(scope="session")
+def session_video_file(tmp_path_factory):
+    """Create the deterministic test video file once per session."""
+    video_path, _ = create_test_video_file(
+        format='mp4', duration=10, dir=str(tmp_path_factory.mktemp('video'))
+    )
+    return video_path
+
 @pytest.fixture(scope="function")
-def test_audio_file():
-    """Create a test audio file with proper WAV format."""
-    audio_path, temp_dir = create_test_audio_file(duration=5, sample_rate=16000)
-    yield audio_path
-    shutil.rmtree(temp_dir)
+def test_audio_file(request, session_audio_file, tmp_path):
+    """Test audio file with proper WAV format; tests marked mutable_audio_file get a private copy."""
+    if request.node.get_closest_marker('mutable_audio_file'):
+        return shutil.copy2(session_audio_file, tmp_path)
+    return session_audio_file
 
 @pytest.fixture(scope="function")
-def test_video_file():
-    """Create a test video file."""
-    video_path, temp_dir = create_test_video_file(format='mp4', duration=10)
-    yield video_path
-    shutil.rmtree(temp_dir)
+def test_video_file(request, session_video_file, tmp_path):
+    """Test video file; tests marked mutable_video_file get a private copy."""
+    if request.node.get_closest_marker('mutable_video_file'):
+        return shutil.copy2(session_video_file, tmp_path)
+    return session_video_file
 
 @pytest.fixture(scope="function")
 def test_video_data():
@@ -166,74 +208,4 @@ def test_empty_audio_file():
     
     # Clean up the temporary directory
     if os.path.exists(temp_dir):
-        import shutil
         shutil.rmtree(temp_dir)
-
-@pytest.fixture
-def mock_audio_processing():
-    """Mock the audio processing functions."""
-    def mock_process(audio_file, enhance=True):
-        return {
-            'success': True,
-            'transcription': 'This is a test transcription.',
-            'summary': 'This is a test summary.'
-        }
-    
-    # Save original function
-    original_process = process_audio
-    
-    # Replace with mock
-    process_audio = mock_process
-    
-    yield mock_process
-    
-    # Restore original function
-    process_audio = original_process
-
-# Add fixtures for extension testing
-@pytest.fixture
-def mock_extension_id():
-    """Mock the extension ID."""
-    return 'test_extension_id'
-
-@pytest.fixture
-def mock_extension_headers(mock_extension_id):
-    """Mock headers for extension requests."""
-    return {
-        'Origin': f'chrome-extension://{mock_extension_id}'
-    }
-
-# Add fixtures for Google auth mocking
-@pytest.fixture
-def mock_google_auth():
-    """Mock Google auth credentials."""
-    return {
-        'token': 'test_token',
-        'refresh_token': 'test_refresh_token',
-        'token_uri': 'https://oauth2.googleapis.com/token',
-        'client_id': 'test_client_id',
-        'client_secret': 'test_client_secret',
-        'scopes': ['profile', 'email']
-    }
-
-@pytest.fixture
-def mock_google_userinfo():
-    """Mock Google userinfo response."""
-    return {
-        'email': 'test@example.com',
-        'name': 'Test User',
-        'picture': 'https://example.com/profile.jpg',
-        'email_verified': True
-    }
-
-# Add fixture for mock video processing
-@pytest.fixture
-def mock_video_processing():
-    """Mock video processing functions."""
-    def mock_extract_audio(video_file):
-        audio_path, _ = create_test_audio_file()
-        return audio_path
-    
-    return {
-        'extract_audio': mock_extract_audio
-    } 
\ No newline at end of file
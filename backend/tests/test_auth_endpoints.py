@@ -1,44 +1,80 @@
 import unittest
 import os
-import json
 from unittest import mock
 from datetime import datetime, timedelta
+from types import SimpleNamespace
 from app.main import create_app
+from tests.test_helpers import EnvGuard
 from app.utils.errors import AuthenticationError
-from functools import wraps
 
-# Create a mock login_required decorator that passes through the function
+# A mock login_required decorator that returns the view unchanged
 def mock_login_required(f):
-    @wraps(f)
-    def decorated_function(*args, **kwargs):
-        return f(*args, **kwargs)
-    return decorated_function
+    return f
+
+# Environment variables the app reads at creation, patched once for the module
+_env_patcher = EnvGuard({
+    'GOOGLE_CLIENT_SECRETS_FILE': 'dummy_path',
+    'FRONTEND_URL': 'http://localhost:3000',
+    'BROWSER_EXTENSION_ID': 'dummy_extension_id',
+    'ALLOWED_ORIGINS': 'http://localhost:3000,chrome-extension://dummy_extension_id'
+})
+
+def setUpModule():
+    _env_patcher.start()
+
+def tearDownModule():
+    _env_patcher.stop()
 
 class TestAuthEndpoints(unittest.TestCase):
     """Test cases for authentication endpoints"""
     
-    def setUp(self):
-        """Set up test environment"""
-        # Mock environment variables
-        self.env_patcher = mock.patch.dict(os.environ, {
-            'GOOGLE_CLIENT_SECRETS_FILE': 'dummy_path',
-            'FRONTEND_URL': 'http://localhost:3000',
-            'BROWSER_EXTENSION_ID': 'dummy_extension_id',
-            'ALLOWED_ORIGINS': 'http://localhost:3000,chrome-extension://dummy_extension_id'
-        })
-        self.env_patcher.start()
-        
+    @classmethod
+    def setUpClass(cls):
+        """Build the app and client once for the class"""
         # Create a test Flask app with testing config
-        self.app = create_app('testing')
+        cls.app = create_app('testing')
         
         # Configure app for testing
-        self.app.config['TESTING'] = True
-        self.app.config['WTF_CSRF_ENABLED'] = False
-        self.app.config['PRESERVE_CONTEXT_ON_EXCEPTION'] = False
-        self.app.config['ALLOWED_ORIGINS'] = 'http://localhost:3000,chrome-extension://dummy_extension_id'
-        self.app.config['SESSION_TYPE'] = 'filesystem'
+        cls.app.config['TESTING'] = True
+        cls.app.config['WTF_CSRF_ENABLED'] = False
+        cls.app.config['PRESERVE_CONTEXT_ON_EXCEPTION'] = False
+        cls.app.config['ALLOWED_ORIGINS'] = 'http://localhost:3000,chrome-extension://dummy_extension_id'
+        cls.app.config['SESSION_TYPE'] = 'filesystem'
         
-        self.client = self.app.test_client()
+        cls.client = cls.app.test_client()
+        
+        # Session timestamps, computed once; the tests finish well inside the session timeout
+        cls._NOW_ISO = datetime.utcnow().isoformat()
+        cls._EXPIRED_ISO = (datetime.utcnow() - timedelta(hours=1)).isoformat()
+        cls._EXPIRED_CREDENTIALS = {
+            'token': 'old_token',
+            'refresh_token': 'mock_refresh_token',
+            'token_uri': 'token_uri',
+            'client_id': 'client_id',
+            'client_secret': 'client_secret',
+            'scopes': ['scope1', 'scope2'],
+            'expiry': cls._EXPIRED_ISO  # Expired token
+        }
+        
+        # The OAuth flow, credentials and user info lookups are patched for the whole
+        # class; setUp resets the mocks and each test configures what it needs
+        cls._flow_patcher = mock.patch('google_auth_oauthlib.flow.Flow.from_client_secrets_file')
+        cls.mock_flow = cls._flow_patcher.start()
+        cls._credentials_patcher = mock.patch('app.auth.routes.Credentials')
+        cls.mock_credentials = cls._credentials_patcher.start()
+        cls._user_info_patcher = mock.patch('app.auth.routes.get_user_info')
+        cls.mock_get_user_info = cls._user_info_patcher.start()
+    
+    @classmethod
+    def tearDownClass(cls):
+        """Stop the class-wide patches"""
+        cls._user_info_patcher.stop()
+        cls._credentials_patcher.stop()
+        cls._flow_patcher.stop()
+    
+    def setUp(self):
+        """Set up per-test patches and start from a fresh app context and empty session"""
+        # A new context per test, so nothing stored on flask.g leaks between tests
         self.app_context = self.app.app_context()
         self.app_context.push()
         
@@ -50,24 +86,28 @@ class TestAuthEndpoints(unittest.TestCase):
         # Set up login_required patcher
         self.login_required_patcher = mock.patch('app.auth.routes.login_required', mock_login_required)
         self.login_required_patcher.start()
+        
+        # Forget the calls and behaviour configured by the previous test
+        for class_mock in (self.mock_flow, self.mock_credentials, self.mock_get_user_info):
+            class_mock.reset_mock(return_value=True, side_effect=True)
+        
+        # The client is shared, so drop whatever the previous test left in the session
+        with self.client.session_transaction() as sess:
+            sess.clear()
     
     def tearDown(self):
         """Clean up test environment"""
-        # Pop the app context
-        self.app_context.pop()
-        
         # Stop patchers
         self.login_required_patcher.stop()
         self.secrets_patcher.stop()
-        self.env_patcher.stop()
+        self.app_context.pop()
     
-    @mock.patch('google_auth_oauthlib.flow.Flow.from_client_secrets_file')
-    def test_login_endpoint(self, mock_flow_from_secrets):
+    def test_login_endpoint(self):
         """Test the login endpoint"""
         # Mock the Flow instance
         mock_flow_instance = mock.MagicMock()
         mock_flow_instance.authorization_url.return_value = ('https://accounts.google.com/o/oauth2/auth?mock=true', 'state_token')
-        mock_flow_from_secrets.return_value = mock_flow_instance
+        self.mock_flow.return_value = mock_flow_instance
         
         # Access the login endpoint
         response = self.client.get('/auth/login')
@@ -76,9 +116,7 @@ class TestAuthEndpoints(unittest.TestCase):
         self.assertEqual(response.status_code, 302)
         self.assertTrue(response.headers['Location'].startswith('https://accounts.google.com/o/oauth2/auth'))
     
-    @mock.patch('google_auth_oauthlib.flow.Flow.from_client_secrets_file')
-    @mock.patch('app.auth.routes.get_user_info')
-    def test_callback_endpoint_success(self, mock_get_user_info, mock_flow_from_secrets):
+    def test_callback_endpoint_success(self):
         """Test the callback endpoint with successful authentication"""
         # Mock the Flow instance
         mock_flow_instance = mock.MagicMock()
@@ -90,10 +128,10 @@ class TestAuthEndpoints(unittest.TestCase):
         mock_credentials.client_secret = 'mock_client_secret'
         mock_credentials.scopes = ['profile', 'email']
         mock_flow_instance.credentials = mock_credentials
-        mock_flow_from_secrets.return_value = mock_flow_instance
+        self.mock_flow.return_value = mock_flow_instance
         
         # Mock the user info
-        mock_get_user_info.return_value = {
+        self.mock_get_user_info.return_value = {
             'email': 'test@example.com',
             'name': 'Test User',
             'picture': 'https://example.com/profile.jpg',
@@ -142,14 +180,14 @@ class TestAuthEndpoints(unittest.TestCase):
         with self.client.session_transaction() as sess:
             sess['user_info'] = {'email': 'test@example.com', 'name': 'Test User'}
             sess['credentials'] = {'token': 'mock_token'}
-            sess['last_activity'] = datetime.utcnow().isoformat()
+            sess['last_activity'] = self._NOW_ISO
         
         # Access the logout endpoint
         response = self.client.post('/auth/logout')
         
         # Check the response
         self.assertEqual(response.status_code, 200)
-        data = json.loads(response.data)
+        data = response.get_json()
         self.assertIn('message', data)
         self.assertEqual(data['message'], 'Successfully logged out')
         
@@ -164,14 +202,14 @@ class TestAuthEndpoints(unittest.TestCase):
         # Set up a session with user info
         with self.client.session_transaction() as sess:
             sess['user_info'] = {'email': 'test@example.com', 'name': 'Test User'}
-            sess['last_activity'] = datetime.utcnow().isoformat()
+            sess['last_activity'] = self._NOW_ISO
         
         # Access the current user endpoint
         response = self.client.get('/auth/user')
         
         # Check the response
         self.assertEqual(response.status_code, 200)
-        data = json.loads(response.data)
+        data = response.get_json()
         self.assertEqual(data['email'], 'test@example.com')
         self.assertEqual(data['name'], 'Test User')
     
@@ -182,40 +220,36 @@ class TestAuthEndpoints(unittest.TestCase):
         
         # Check the response
         self.assertEqual(response.status_code, 401)
-        data = json.loads(response.data)
+        data = response.get_json()
         self.assertIn('error', data)
         self.assertEqual(data['error'], 'Authentication required')
     
-    @mock.patch('app.auth.routes.Credentials')
-    def test_refresh_token_endpoint_success(self, mock_credentials_class):
+    def test_refresh_token_endpoint_success(self):
         """Test the refresh token endpoint with successful refresh"""
         # Set up a session with credentials
         with self.client.session_transaction() as sess:
             sess['user_info'] = {'email': 'test@example.com', 'name': 'Test User'}
-            sess['credentials'] = {
-                'token': 'old_token',
-                'refresh_token': 'mock_refresh_token',
-                'token_uri': 'token_uri',
-                'client_id': 'client_id',
-                'client_secret': 'client_secret',
-                'scopes': ['scope1', 'scope2'],
-                'expiry': (datetime.utcnow() - timedelta(hours=1)).isoformat()  # Expired token
-            }
-            sess['last_activity'] = datetime.utcnow().isoformat()
+            sess['credentials'] = dict(self._EXPIRED_CREDENTIALS)
+            sess['last_activity'] = self._NOW_ISO
         
-        # Mock the credentials
-        mock_creds_instance = mock.MagicMock()
-        mock_creds_instance.token = 'new_token'
-        mock_creds_instance.refresh_token = 'mock_refresh_token'
-        mock_creds_instance.expired = True
-        mock_credentials_class.return_value = mock_creds_instance
+        # Stand-in credentials: plain attributes plus a refresh that succeeds
+        self.mock_credentials.return_value = SimpleNamespace(
+            token='new_token',
+            refresh_token='mock_refresh_token',
+            token_uri='token_uri',
+            client_id='client_id',
+            client_secret='client_secret',
+            scopes=['scope1', 'scope2'],
+            expired=True,
+            refresh=lambda request: None
+        )
         
         # Access the refresh token endpoint
         response = self.client.post('/auth/refresh-token')
         
         # Check the response
         self.assertEqual(response.status_code, 200)
-        data = json.loads(response.data)
+        data = response.get_json()
         self.assertIn('access_token', data)
         self.assertEqual(data['access_token'], 'new_token')
     
@@ -226,39 +260,30 @@ class TestAuthEndpoints(unittest.TestCase):
         
         # Check the response
         self.assertEqual(response.status_code, 401)
-        data = json.loads(response.data)
+        data = response.get_json()
         self.assertIn('error', data)
         self.assertEqual(data['error'], 'No credentials found')
     
-    @mock.patch('app.auth.routes.Credentials')
-    def test_refresh_token_endpoint_error(self, mock_credentials_class):
+    def test_refresh_token_endpoint_error(self):
         """Test the refresh token endpoint with a refresh error"""
         # Set up a session with credentials
         with self.client.session_transaction() as sess:
             sess['user_info'] = {'email': 'test@example.com', 'name': 'Test User'}
-            sess['credentials'] = {
-                'token': 'old_token',
-                'refresh_token': 'mock_refresh_token',
-                'token_uri': 'token_uri',
-                'client_id': 'client_id',
-                'client_secret': 'client_secret',
-                'scopes': ['scope1', 'scope2'],
-                'expiry': (datetime.utcnow() - timedelta(hours=1)).isoformat()  # Expired token
-            }
-            sess['last_activity'] = datetime.utcnow().isoformat()
+            sess['credentials'] = dict(self._EXPIRED_CREDENTIALS)
+            sess['last_activity'] = self._NOW_ISO
         
-        # Mock the credentials to raise an exception during refresh
-        mock_creds_instance = mock.MagicMock()
-        mock_creds_instance.expired = True
-        mock_creds_instance.refresh.side_effect = Exception("Token refresh failed")
-        mock_credentials_class.return_value = mock_creds_instance
+        # Stand-in credentials whose refresh raises; only refresh needs to be a mock
+        self.mock_credentials.return_value = SimpleNamespace(
+            expired=True,
+            refresh=mock.Mock(side_effect=Exception("Token refresh failed"))
+        )
         
         # Access the refresh token endpoint
         response = self.client.post('/auth/refresh-token')
         
         # Check the response
         self.assertEqual(response.status_code, 401)
-        data = json.loads(response.data)
+        data = response.get_json()
         self.assertIn('error', data)
         self.assertEqual(data['error'], 'Token refresh failed, please login again')
 
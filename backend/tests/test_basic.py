@@ -3,11 +3,12 @@
 
 import unittest
 import os
+import shutil
 import tempfile
-import json
+import operator
 from datetime import datetime, timedelta
-from unittest import mock
 from app.main import create_app
+from tests.test_helpers import EnvGuard
 from tests.test_helpers_validation import (
     create_test_audio_file,
     create_test_video_file,
@@ -18,55 +19,69 @@ from tests.test_helpers_validation import (
 class TestBasic(unittest.TestCase):
     """Basic test case to demonstrate test runner functionality"""
     
-    def test_addition(self):
-        """Test that addition works"""
-        self.assertEqual(2 + 2, 4)
-    
-    def test_subtraction(self):
-        """Test that subtraction works"""
-        self.assertEqual(5 - 2, 3)
-    
-    def test_multiplication(self):
-        """Test that multiplication works"""
-        self.assertEqual(3 * 4, 12)
-    
-    def test_division(self):
-        """Test that division works"""
-        self.assertEqual(8 / 4, 2)
+    def test_arithmetic(self):
+        """Test that addition, subtraction, multiplication and division work"""
+        for a, op, b, expected in [
+            (2, operator.add, 2, 4),
+            (5, operator.sub, 2, 3),
+            (3, operator.mul, 4, 12),
+            (8, operator.truediv, 4, 2),
+        ]:
+            with self.subTest(op=op.__name__):
+                self.assertEqual(op(a, b), expected)
+
+# Environment variables the app reads at creation, patched once for the module
+_env_patcher = EnvGuard({
+    'GOOGLE_CLIENT_SECRETS_FILE': 'dummy_path',
+    'FRONTEND_URL': 'http://localhost:3000',
+    'BROWSER_EXTENSION_ID': 'test_extension_id',
+    'ALLOWED_ORIGINS': 'http://localhost:3000,chrome-extension://test_extension_id'
+})
+
+def setUpModule():
+    _env_patcher.start()
+
+def tearDownModule():
+    _env_patcher.stop()
 
 class TestBasicFunctionality(unittest.TestCase):
     """Test basic functionality of the application."""
     
-    def setUp(self):
-        """Set up test environment."""
-        # Mock environment variables
-        self.env_patcher = mock.patch.dict(os.environ, {
-            'GOOGLE_CLIENT_SECRETS_FILE': 'dummy_path',
-            'FRONTEND_URL': 'http://localhost:3000',
-            'BROWSER_EXTENSION_ID': 'test_extension_id',
-            'ALLOWED_ORIGINS': 'http://localhost:3000,chrome-extension://test_extension_id'
-        })
-        self.env_patcher.start()
-        
+    @classmethod
+    def setUpClass(cls):
+        """Build the app and client once, and one scratch directory for the file-creation tests."""
         # Create a test Flask app with testing config
-        self.app = create_app('testing')
+        cls.app = create_app('testing')
         
         # Configure app for testing
-        self.app.config.update({
+        cls.app.config.update({
             'TESTING': True,
             'WTF_CSRF_ENABLED': False,
             'PRESERVE_CONTEXT_ON_EXCEPTION': False,
             'SECRET_KEY': 'test_secret_key'
         })
         
-        self.client = self.app.test_client()
+        cls.client = cls.app.test_client()
+        cls._tmp = tempfile.mkdtemp()
+    
+    @classmethod
+    def tearDownClass(cls):
+        """Remove the scratch directory."""
+        shutil.rmtree(cls._tmp, ignore_errors=True)
+    
+    def setUp(self):
+        """Push a fresh app context and start from an empty session."""
+        # A new context per test, so nothing stored on flask.g leaks between tests
         self.app_context = self.app.app_context()
         self.app_context.push()
+        
+        # The client is shared, so drop whatever the previous test left in the session
+        with self.client.session_transaction() as sess:
+            sess.clear()
     
     def tearDown(self):
         """Clean up test environment."""
         self.app_context.pop()
-        self.env_patcher.stop()
     
     def test_app_creation(self):
         """Test that the application is created correctly."""
@@ -77,7 +92,7 @@ class TestBasicFunctionality(unittest.TestCase):
         """Test the extension status endpoint."""
         response = self.client.get('/api/extension/status')
         self.assertEqual(response.status_code, 200)
-        data = json.loads(response.data)
+        data = response.get_json()
         self.assertIn('status', data)
         self.assertEqual(data['status'], 'connected')
     
@@ -85,32 +100,24 @@ class TestBasicFunctionality(unittest.TestCase):
         """Test that the API routes exist."""
         response = self.client.get('/api/extension/status')
         self.assertEqual(response.status_code, 200)
-        data = json.loads(response.data)
+        data = response.get_json()
         self.assertIn('status', data)
         self.assertEqual(data['status'], 'connected')
     
     def test_audio_file_creation(self):
         """Test that audio files can be created."""
-        audio_path, temp_dir = create_test_audio_file()
-        try:
-            self.assertTrue(os.path.exists(audio_path))
-            self.assertTrue(validate_audio_file(audio_path))
-        finally:
-            if os.path.exists(temp_dir):
-                import shutil
-                shutil.rmtree(temp_dir)
+        audio_path, _ = create_test_audio_file(dir=self._tmp)
+        self.addCleanup(os.unlink, audio_path)
+        self.assertTrue(os.path.exists(audio_path))
+        self.assertTrue(validate_audio_file(audio_path))
     
     def test_video_file_creation(self):
         """Test that video files can be created."""
-        video_path, temp_dir = create_test_video_file()
-        try:
-            self.assertTrue(os.path.exists(video_path))
-            # Check file size
-            self.assertGreater(os.path.getsize(video_path), 0)
-        finally:
-            if os.path.exists(temp_dir):
-                import shutil
-                shutil.rmtree(temp_dir)
+        video_path, _ = create_test_video_file(dir=self._tmp)
+        self.addCleanup(os.unlink, video_path)
+        self.assertTrue(os.path.exists(video_path))
+        # Check file size
+        self.assertGreater(os.path.getsize(video_path), 0)
     
     def test_summary_data_creation(self):
         """Test that summary data can be created."""
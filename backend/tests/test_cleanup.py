@@ -5,7 +5,6 @@ import shutil
 import tempfile
 from unittest import mock
 import sys
-import os
 
 # Add the tests directory to the path for imports
 sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
@@ -21,14 +20,15 @@ class TestCleanup:
         TestConfig.cleanup_test_dirs()
         
         # Clean up any remaining temporary files
-        temp_dir = tempfile.gettempdir()
-        for filename in os.listdir(temp_dir):
-            if filename.startswith('test_') and filename.endswith('.wav'):
-                file_path = os.path.join(temp_dir, filename)
-                try:
-                    os.remove(file_path)
-                except OSError:
-                    pass
+        # scandir streams the entries instead of listing the whole shared tmpdir
+        with os.scandir(tempfile.gettempdir()) as entries:
+            for entry in entries:
+                name = entry.name
+                if name.startswith('test_') and name.endswith('.wav'):
+                    try:
+                        os.unlink(entry.path)
+                    except OSError:
+                        pass
     
     @staticmethod
     def cleanup_mocks():
@@ -43,50 +43,25 @@ class TestCleanup:
     @staticmethod
     def cleanup_test_data():
         """Clean up test data."""
+        # The paths are created lazily; don't create the directory just to remove it
+        if not TestConfig.has_test_dir():
+            return
+        
         # Clean up test files
-        if hasattr(TestConfig, 'TEST_AUDIO_FILE') and os.path.exists(TestConfig.TEST_AUDIO_FILE):
-            os.remove(TestConfig.TEST_AUDIO_FILE)
+        if os.path.exists(TestConfig.get_test_audio_file()):
+            os.remove(TestConfig.get_test_audio_file())
         
-        if hasattr(TestConfig, 'TEST_SUMMARY_FILE') and os.path.exists(TestConfig.TEST_SUMMARY_FILE):
-            os.remove(TestConfig.TEST_SUMMARY_FILE)
+        if os.path.exists(TestConfig.get_test_summary_file()):
+            os.remove(TestConfig.get_test_summary_file())
         
         # Clean up test directories
-        if hasattr(TestConfig, 'TEST_AUDIO_DIR') and os.path.exists(TestConfig.TEST_AUDIO_DIR):
-            shutil.rmtree(TestConfig.TEST_AUDIO_DIR)
+        if os.path.exists(TestConfig.get_test_audio_dir()):
+            shutil.rmtree(TestConfig.get_test_audio_dir())
         
-        if hasattr(TestConfig, 'TEST_SUMMARIES_DIR') and os.path.exists(TestConfig.TEST_SUMMARIES_DIR):
-            shutil.rmtree(TestConfig.TEST_SUMMARIES_DIR)
+        if os.path.exists(TestConfig.get_test_summaries_dir()):
+            shutil.rmtree(TestConfig.get_test_summaries_dir())
         
-        if hasattr(TestConfig, 'TEST_DIR') and os.path.exists(TestConfig.TEST_DIR):
-            shutil.rmtree(TestConfig.TEST_DIR)
-    
-    @staticmethod
-    def cleanup_test_session():
-        """Clean up test session data."""
-        # Clear any test session data
-        if hasattr(TestConfig, 'TEST_SESSION_SETTINGS'):
-            TestConfig.TEST_SESSION_SETTINGS.clear()
-    
-    @staticmethod
-    def cleanup_test_request():
-        """Clean up test request data."""
-        # Clear any test request data
-        if hasattr(TestConfig, 'TEST_EXTENSION_REQUEST'):
-            TestConfig.TEST_EXTENSION_REQUEST.clear()
-    
-    @staticmethod
-    def cleanup_test_response():
-        """Clean up test response data."""
-        # Clear any test response data
-        if hasattr(TestConfig, 'TEST_RESPONSE_SETTINGS'):
-            TestConfig.TEST_RESPONSE_SETTINGS.clear()
-    
-    @staticmethod
-    def cleanup_test_validation():
-        """Clean up test validation data."""
-        # Clear any test validation data
-        if hasattr(TestConfig, 'TEST_VALIDATION_SETTINGS'):
-            TestConfig.TEST_VALIDATION_SETTINGS.clear()
+        TestConfig.cleanup_test_dirs()
     
     @staticmethod
     def cleanup_all():
@@ -94,10 +69,6 @@ class TestCleanup:
         TestCleanup.cleanup_temp_files()
         TestCleanup.cleanup_mocks()
         TestCleanup.cleanup_test_data()
-        TestCleanup.cleanup_test_session()
-        TestCleanup.cleanup_test_request()
-        TestCleanup.cleanup_test_response()
-        TestCleanup.cleanup_test_validation()
     
     @staticmethod
     def cleanup_directory(directory):
@@ -100,18 +100,19 @@ def create_test_video_data_with_options(title=TEST_VIDEO_TITLE, duration=TEST_VI
         'in_iframe': in_iframe
     }
 
-def create_test_video_file(format='mp4', duration=TEST_AUDIO_DURATION, filename=None):
+def create_test_video_file(format='mp4', duration=TEST_AUDIO_DURATION, filename=None, dir=None):
     """Create a test video file with dummy content.
     
     Args:
         format (str): Video format extension (mp4, avi, etc.)
         duration (int): Duration in seconds
         filename (str, optional): Custom filename
+        dir (str, optional): Existing directory to write into; a new temp dir is created if omitted
         
     Returns:
         tuple: (file_path, temp_dir)
     """
-    temp_dir = tempfile.mkdtemp()
+    temp_dir = dir if dir else tempfile.mkdtemp()
     if not filename:
         filename = f'test_video.{format}'
     video_path = os.path.join(temp_dir, filename)
@@ -137,7 +138,7 @@ def mock_extension_headers(extension_id=TEST_EXTENSION_ID):
     """Create headers for extension requests."""
     return {'Origin': f'chrome-extension://{extension_id}'}
 
-def create_test_audio_file(duration=TEST_AUDIO_DURATION, sample_rate=TEST_AUDIO_SAMPLE_RATE, num_channels=1, filename=None):
+def create_test_audio_file(duration=TEST_AUDIO_DURATION, sample_rate=TEST_AUDIO_SAMPLE_RATE, num_channels=1, filename=None, dir=None):
     """Create a test audio file with proper WAV format.
     
     Args:
@@ -145,11 +146,12 @@ def create_test_audio_file(duration=TEST_AUDIO_DURATION, sample_rate=TEST_AUDIO_
         sample_rate (int): Sample rate in Hz
         num_channels (int): Number of audio channels
         filename (str, optional): Custom filename
+        dir (str, optional): Existing directory to write into; a new temp dir is created if omitted
         
     Returns:
         tuple: (file_path, temp_dir)
     """
-    temp_dir = tempfile.mkdtemp()
+    temp_dir = dir if dir else tempfile.mkdtemp()
     if not filename:
         filename = 'test_audio.wav'
     audio_path = os.path.join(temp_dir, filename)
@@ -211,6 +213,40 @@ def mock_file_operations():
         mock_makedirs.return_value = None
         return mock_exists, mock_size, mock_makedirs
 
+class EnvGuard:
+    """Set environment variables and restore only those keys afterwards.
+
+    A lighter stand-in for mock.patch.dict(os.environ, ...), which snapshots and
+    restores the whole environment. Usable as a context manager or, like a
+    patcher, through start() and stop().
+
+    Args:
+        values (dict): Variables to set while the guard is active
+    """
+
+    def __init__(self, values):
+        self.values = values
+        self._previous = {}
+
+    def start(self):
+        self._previous = {key: os.environ.get(key) for key in self.values}
+        os.environ.update(self.values)
+
+    def stop(self):
+        for key, value in self._previous.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+        self._previous = {}
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
 def create_test_summary_file(summary_data):
     """Create a test summary file."""
     temp_dir = tempfile.mkdtemp()
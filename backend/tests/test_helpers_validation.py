@@ -34,9 +34,9 @@ def cleanup_temp_dir(temp_dir):
         shutil.rmtree(temp_dir)
 
 
-def create_test_audio_file(duration=TEST_AUDIO_DURATION, sample_rate=TEST_AUDIO_SAMPLE_RATE, num_channels=1, filename=None):
-    """Create a test audio file with proper WAV format."""
-    temp_dir = tempfile.mkdtemp()
+def create_test_audio_file(duration=TEST_AUDIO_DURATION, sample_rate=TEST_AUDIO_SAMPLE_RATE, num_channels=1, filename=None, dir=None):
+    """Create a test audio file with proper WAV format, in dir if given."""
+    temp_dir = dir if dir else tempfile.mkdtemp()
     if not filename:
         filename = 'test_audio.wav'
     audio_path = os.path.join(temp_dir, filename)
@@ -58,9 +58,9 @@ def create_test_audio_file(duration=TEST_AUDIO_DURATION, sample_rate=TEST_AUDIO_
     return audio_path, temp_dir
 
 
-def create_test_video_file(format='mp4', duration=TEST_AUDIO_DURATION, filename=None):
-    """Create a test video file with dummy content."""
-    temp_dir = tempfile.mkdtemp()
+def create_test_video_file(format='mp4', duration=TEST_AUDIO_DURATION, filename=None, dir=None):
+    """Create a test video file with dummy content, in dir if given."""
+    temp_dir = dir if dir else tempfile.mkdtemp()
     if not filename:
         filename = f'test_video.{format}'
     video_path = os.path.join(temp_dir, filename)
@@ -63,23 +63,23 @@ class TestSetup:
     def create_test_files():
         """Create test files."""
         # Create test audio file
-        with open(TestConfig.TEST_AUDIO_FILE, 'w') as f:
+        with open(TestConfig.get_test_audio_file(), 'w') as f:
             f.write('dummy audio content')
         
         # Create test summary file
-        with open(TestConfig.TEST_SUMMARY_FILE, 'w') as f:
+        with open(TestConfig.get_test_summary_file(), 'w') as f:
             f.write('{"summary": "Test summary", "video_data": {"title": "Test Video"}}')
     
     @staticmethod
     def cleanup_test_files():
         """Clean up test files."""
         # Remove test audio file
-        if os.path.exists(TestConfig.TEST_AUDIO_FILE):
-            os.remove(TestConfig.TEST_AUDIO_FILE)
+        if os.path.exists(TestConfig.get_test_audio_file()):
+            os.remove(TestConfig.get_test_audio_file())
         
         # Remove test summary file
-        if os.path.exists(TestConfig.TEST_SUMMARY_FILE):
-            os.remove(TestConfig.TEST_SUMMARY_FILE)
+        if os.path.exists(TestConfig.get_test_summary_file()):
+            os.remove(TestConfig.get_test_summary_file())
     
     @staticmethod
     def setup_test_session():
@@ -0,0 +1,34 @@
+import pytest
+from app.summarizer.processor import preprocess_text, postprocess_summary
+
+# Pure string transforms: no class, so none of the audio tests' setup runs for these
+
+PREPROCESS_TEXT = "This is an important sentence. This is a regular sentence."
+POSTPROCESS_TEXT = "First point. Second point. Third point."
+
+@pytest.mark.parametrize("focus,expected", [
+    (['key_points'], "This is an important sentence. This is a regular sentence.."),
+    ([], PREPROCESS_TEXT),
+], ids=['key_points', 'no_focus'])
+def test_preprocess_text(focus, expected):
+    """Test text preprocessing for summarization"""
+    assert preprocess_text(PREPROCESS_TEXT, focus) == expected
+
+@pytest.mark.parametrize("fmt,expected_markers", [
+    ('bullets', ["• First point.", "• Second point.", "• Third point."]),
+    ('numbered', ["1. First point.", "2. Second point.", "3. Third point."]),
+    ('key_points', ["Key Points:", "• First point."]),
+    ('paragraphs', None),
+    (None, None),
+], ids=['bullets', 'numbered', 'key_points', 'paragraphs', 'unspecified'])
+def test_postprocess_summary_format(fmt, expected_markers):
+    """Test summary post-processing for each output format"""
+    options = {'format': fmt} if fmt else {}
+    result = postprocess_summary(POSTPROCESS_TEXT, options)
+    
+    if expected_markers is None:
+        # Paragraphs (the default) leave the text unchanged
+        assert result == POSTPROCESS_TEXT
+    else:
+        for marker in expected_markers:
+            assert marker in result